@@ -1,5 +1,6 @@
 import os
 import json
+from functools import lru_cache
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -7,6 +8,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=None)
+def _load_floors_config(config_path, mtime_ns):
+    """Reads the floors section of the config, cached per (path, mtime).
+
+    The mtime in the key means an edited file re-parses on next use while
+    repeated constructions share one parse. Treat the result as read-only.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('floors', {})
+
 class ChartGenerator:
     def __init__(self, db_path):
         self.db_path = db_path
@@ -15,20 +26,36 @@ class ChartGenerator:
         logger.info("ChartGenerator initialized.")
         
         self.floors_config = self.load_config()
+        # Flat node -> floor lookup; get_node_floor is called twice per bar,
+        # and scanning floors_config there made it O(floors x nodes) per call.
+        self._node_floor = {str(n): floor for floor, floor_nodes in self.floors_config.items() for n in floor_nodes}
+        # Peer lists per node, precomputed once so the neighbor helpers skip
+        # rebuilding them from floors_config on every call.
+        all_nodes = [str(n) for floor_nodes in self.floors_config.values() for n in floor_nodes]
+        self._same_floor_peers = {str(n): [str(m) for m in floor_nodes if str(m) != str(n)]
+                                  for floor_nodes in self.floors_config.values() for n in floor_nodes}
+        self._other_floor_peers = {node: [m for m in all_nodes if self._node_floor[m] != floor]
+                                   for node, floor in self._node_floor.items()}
         self.color_palette = ['#D4A574', '#9FD4E8', '#E8A5A5', '#A5E8A5', '#E8C5E8', '#E8E8A5', '#C5E8E8', '#E8C5A5']
+        # One persistent figure is cleared and redrawn on every call;
+        # allocating a fresh Figure per chart leaked Agg buffers and
+        # re-rasterizing at dpi=300 dominated the render time.
+        self._fig, self._ax = plt.subplots(figsize=(16, 8))
 
     def load_config(self, config_path='bleConfig.json'):
         """Loads floor configuration from a JSON file."""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            return config.get('floors', {})
+            path = os.path.abspath(config_path)
+            return _load_floors_config(path, os.stat(path).st_mtime_ns)
         except FileNotFoundError:
             logger.warning(f"Config file not found at '{config_path}'. Using default floor config.")
             return {'floor1': [1, 2, 3, 4, 5], 'floor2': [6, 7, 8, 9, 10]}
 
-    def get_node_floor(self, node_id, floors_config):
+    def get_node_floor(self, node_id, floors_config=None):
         """Gets the floor for a given node ID."""
+        if floors_config is None or floors_config is self.floors_config:
+            return self._node_floor.get(str(node_id))
+        # Fallback for callers supplying a config other than the loaded one.
         try:
             node_int = int(node_id)
             for floor_name, nodes in floors_config.items():
@@ -38,31 +65,51 @@ class ChartGenerator:
         return None
 
     def get_same_floor_neighbors(self, node_id, floors_config, df, test_group):
-        node_floor = self.get_node_floor(node_id, floors_config)
-        if not node_floor: return []
-        same_floor_nodes = [str(n) for n in floors_config[node_floor] if str(n) != node_id]
+        if floors_config is None or floors_config is self.floors_config:
+            same_floor_nodes = self._same_floor_peers.get(str(node_id))
+        else:
+            node_floor = self.get_node_floor(node_id, floors_config)
+            same_floor_nodes = ([str(n) for n in floors_config[node_floor] if str(n) != node_id]
+                                if node_floor else None)
+        if not same_floor_nodes: return []
         connections = df[(df['Node ID'] == node_id) & (df['Neighbor ID'].isin(same_floor_nodes)) & (df['Test Group'] == test_group)]
         return connections.nlargest(2, 'Average Reception Rate')['Neighbor ID'].tolist()
 
     def get_cross_floor_neighbors(self, node_id, floors_config, df, test_group):
-        node_floor = self.get_node_floor(node_id, floors_config)
-        if not node_floor: return []
-        other_floor_nodes = []
-        for floor_name, nodes in floors_config.items():
-            if floor_name != node_floor:
-                other_floor_nodes.extend([str(n) for n in nodes])
+        if floors_config is None or floors_config is self.floors_config:
+            other_floor_nodes = self._other_floor_peers.get(str(node_id))
+        else:
+            node_floor = self.get_node_floor(node_id, floors_config)
+            other_floor_nodes = None
+            if node_floor:
+                other_floor_nodes = [str(n) for floor_name, nodes in floors_config.items()
+                                     if floor_name != node_floor for n in nodes]
+        if not other_floor_nodes: return []
         connections = df[(df['Node ID'] == node_id) & (df['Neighbor ID'].isin(other_floor_nodes)) & (df['Test Group'] == test_group)]
         return connections.nlargest(2, 'Average Reception Rate')['Neighbor ID'].tolist()
 
     def generate_mappings(self, nodes, test_groups, df):
-        same_floor_mapping, cross_floor_mapping = {}, {}
-        for node in nodes:
-            same_neighbors_all, cross_neighbors_all = [], []
-            for test_group in test_groups:
-                same_neighbors_all.extend(self.get_same_floor_neighbors(node, self.floors_config, df, test_group))
-                cross_neighbors_all.extend(self.get_cross_floor_neighbors(node, self.floors_config, df, test_group))
-            same_floor_mapping[node] = list(set(same_neighbors_all))
-            cross_floor_mapping[node] = list(set(cross_neighbors_all))
+        # One vectorized pass replaces the per-(node, group) helpers, which
+        # re-filtered the whole frame four times per combination.
+        same_floor_mapping = {node: [] for node in nodes}
+        cross_floor_mapping = {node: [] for node in nodes}
+
+        sub = df[['Node ID', 'Neighbor ID', 'Test Group', 'Average Reception Rate']].copy()
+        sub['node_floor'] = sub['Node ID'].map(self._node_floor)
+        sub['neighbor_floor'] = sub['Neighbor ID'].map(self._node_floor)
+        sub = sub[sub['node_floor'].notna() & sub['neighbor_floor'].notna() & (sub['Node ID'] != sub['Neighbor ID'])]
+        sub['same'] = sub['node_floor'] == sub['neighbor_floor']
+
+        # Stable descending sort + head(2) keeps nlargest's tie-breaking.
+        top2 = (sub.sort_values('Average Reception Rate', ascending=False, kind='stable')
+                   .groupby(['Node ID', 'Test Group', 'same'], sort=False, observed=True)
+                   .head(2))
+        for (node, same), neighbors in top2.groupby(['Node ID', 'same'], sort=False, observed=True)['Neighbor ID']:
+            mapping = same_floor_mapping if same else cross_floor_mapping
+            if node in mapping:
+                # dict.fromkeys dedups in one pass and keeps the
+                # rate-descending order from the sort above.
+                mapping[node] = list(dict.fromkeys(neighbors))
         return same_floor_mapping, cross_floor_mapping
 
     def generate_chart(self, csv_path="data_all.csv", output_path="chart.png"):
@@ -80,33 +127,56 @@ class ChartGenerator:
             df['Node ID'] = df['Node ID'].astype(str)
             df['Neighbor ID'] = df['Neighbor ID'].astype(str)
             df['Test Group'] = df['Test Group'].astype(str)
+            # Short repeated strings as categoricals: comparisons and groupby
+            # run on integer codes and each distinct ID is stored once. Node
+            # and neighbor share one dtype so the columns stay comparable.
+            id_dtype = pd.CategoricalDtype(pd.unique(pd.concat([df['Node ID'], df['Neighbor ID']])))
+            df['Node ID'] = df['Node ID'].astype(id_dtype)
+            df['Neighbor ID'] = df['Neighbor ID'].astype(id_dtype)
+            df['Test Group'] = df['Test Group'].astype('category')
             
             nodes = sorted(df['Node ID'].unique(), key=lambda x: int(x))
             test_groups = sorted(df['Test Group'].unique())
             group_colors = {group: self.color_palette[i % len(self.color_palette)] for i, group in enumerate(test_groups)}
             
+            # Group the frame once; the previous per-bar boolean masks
+            # rescanned every row O(nodes x groups) times.
+            bars_by_group_node = {key: sub for key, sub in df.groupby(['Test Group', 'Node ID'], sort=False, observed=True)}
+            rate_map = df.set_index(['Node ID', 'Neighbor ID', 'Test Group'])['Average Reception Rate'].to_dict()
+
             x = np.arange(len(nodes))
             bar_width = 0.35 if len(test_groups) <= 2 else 0.3
             group_gap = 0.1
-            fig, ax = plt.subplots(figsize=(16, 8))
-            
+            fig, ax = self._fig, self._ax
+            ax.clear()
+
             for i, test_group in enumerate(test_groups):
                 x_offset = (i - (len(test_groups) - 1) / 2) * (bar_width + group_gap / len(test_groups))
                 x_pos = x + x_offset
+                # Collect every stack segment of this group first, split by
+                # same/cross floor, so the group renders as two batched
+                # ax.bar calls instead of one artist per segment.
+                segments = {0.9: ([], [], []), 0.4: ([], [], [])}
+                labels = []
                 for j, node in enumerate(nodes):
-                    group = df[(df['Node ID'] == node) & (df['Test Group'] == test_group)]
-                    if len(group) == 0: continue
-                    stack_bottom = 0
+                    group = bars_by_group_node.get((test_group, node))
+                    if group is None: continue
                     group = group.sort_values('Average Reception Rate', ascending=False)
-                    for _, row in group.iterrows():
-                        recv, neighbor = row['Average Reception Rate'], row['Neighbor ID']
-                        node_floor, neighbor_floor = self.get_node_floor(node, self.floors_config), self.get_node_floor(neighbor, self.floors_config)
-                        alpha = 0.9 if node_floor == neighbor_floor else 0.4
-                        ax.bar(x_pos[j], recv, width=bar_width, bottom=stack_bottom, color=group_colors[test_group], edgecolor='white', linewidth=0.5, alpha=alpha)
+                    heights = group['Average Reception Rate'].to_numpy()
+                    bottoms = np.concatenate(([0.0], np.cumsum(heights)[:-1]))
+                    node_floor = self.get_node_floor(node, self.floors_config)
+                    for neighbor, recv, stack_bottom in zip(group['Neighbor ID'], heights, bottoms):
+                        alpha = 0.9 if self.get_node_floor(neighbor, self.floors_config) == node_floor else 0.4
+                        xs, hs, bs = segments[alpha]
+                        xs.append(x_pos[j]); hs.append(recv); bs.append(stack_bottom)
                         if recv > 0:
-                            ax.text(x_pos[j], stack_bottom + recv * 0.7, neighbor, ha='center', va='center', fontsize=9, color='red', fontweight='bold')
-                            ax.text(x_pos[j], stack_bottom + recv * 0.2, f'{recv:.1f}', ha='center', va='center', fontsize=8, color='black')
-                        stack_bottom += recv
+                            labels.append((x_pos[j], stack_bottom, recv, neighbor))
+                for alpha, (xs, hs, bs) in segments.items():
+                    if xs:
+                        ax.bar(xs, hs, width=bar_width, bottom=bs, color=group_colors[test_group], edgecolor='white', linewidth=0.5, alpha=alpha)
+                for bar_x, stack_bottom, recv, neighbor in labels:
+                    ax.text(bar_x, stack_bottom + recv * 0.7, neighbor, ha='center', va='center', fontsize=9, color='red', fontweight='bold')
+                    ax.text(bar_x, stack_bottom + recv * 0.2, f'{recv:.1f}', ha='center', va='center', fontsize=8, color='black')
             
             ax.set_xticks(x)
             ax.set_xticklabels([f'{node:0>2}' for node in nodes])
@@ -114,7 +184,7 @@ class ChartGenerator:
             ax.set_ylabel('Average Reception Rate (packets/sec)', fontsize=12)
             ax.set_title('Node Reception Rate Comparison by Test Group', fontsize=14, fontweight='bold')
             
-            y_max = df.groupby(['Node ID', 'Test Group'])['Average Reception Rate'].sum().max()
+            y_max = df.groupby(['Node ID', 'Test Group'], observed=True)['Average Reception Rate'].sum().max()
             ax.set_ylim(0, y_max * 1.5 if pd.notna(y_max) and y_max > 0 else 1)
             ax.grid(True, axis='y', linestyle='--', alpha=0.3)
             
@@ -123,14 +193,15 @@ class ChartGenerator:
             ax.legend(handles=legend_elements, loc='upper right', fontsize=9)
             
             same_floor_mapping, cross_floor_mapping = self.generate_mappings(nodes, test_groups, df)
+            per_group_mean = df.groupby('Test Group', observed=True)['Average Reception Rate'].mean()
             y_position, box_colors = 0.98, ['lightyellow', 'lightblue', 'lightgreen', 'lightpink', 'lightgray']
-            
+
             for i, test_group in enumerate(test_groups):
-                cross_floor_data = [df[(df['Node ID'] == n) & (df['Neighbor ID'] == nb) & (df['Test Group'] == test_group)]['Average Reception Rate'].iloc[0] for n, nbs in cross_floor_mapping.items() for nb in nbs if not df[(df['Node ID'] == n) & (df['Neighbor ID'] == nb) & (df['Test Group'] == test_group)].empty]
-                same_floor_data = [df[(df['Node ID'] == n) & (df['Neighbor ID'] == nb) & (df['Test Group'] == test_group)]['Average Reception Rate'].iloc[0] for n, nbs in same_floor_mapping.items() for nb in nbs if not df[(df['Node ID'] == n) & (df['Neighbor ID'] == nb) & (df['Test Group'] == test_group)].empty]
-                
+                cross_floor_data = [v for n, nbs in cross_floor_mapping.items() for nb in nbs if (v := rate_map.get((n, nb, test_group))) is not None]
+                same_floor_data = [v for n, nbs in same_floor_mapping.items() for nb in nbs if (v := rate_map.get((n, nb, test_group))) is not None]
+
                 cross_avg, same_avg = np.mean(cross_floor_data) if cross_floor_data else 0, np.mean(same_floor_data) if same_floor_data else 0
-                total_avg = df[df['Test Group'] == test_group]['Average Reception Rate'].mean()
+                total_avg = per_group_mean[test_group]
                 
                 stats_text = f"""{test_group} Statistics
 Same-Floor Avg: {same_avg:.2f} pkts/sec
@@ -139,17 +210,16 @@ Overall Avg: {total_avg:.2f} pkts/sec"""
                 ax.text(0.02, y_position - i * 0.12, stats_text, transform=ax.transAxes, fontsize=9, verticalalignment='top', bbox=dict(boxstyle='round', facecolor=box_colors[i % len(box_colors)], alpha=0.9))
             
             if len(test_groups) >= 2:
-                base_group, base_avg = test_groups[0], df[df['Test Group'] == test_groups[0]]['Average Reception Rate'].mean()
+                base_group, base_avg = test_groups[0], per_group_mean[test_groups[0]]
                 improvement_text = f"Improvement vs {base_group}:\n"
                 for test_group in test_groups[1:]:
-                    current_avg = df[df['Test Group'] == test_group]['Average Reception Rate'].mean()
+                    current_avg = per_group_mean[test_group]
                     improvement = ((current_avg - base_avg) / base_avg) * 100 if base_avg > 0 else 0
                     improvement_text += f"{test_group}: {current_avg - base_avg:+.2f} pkts/sec ({improvement:+.1f}%)\n"
                 ax.text(0.02, y_position - len(test_groups) * 0.12, improvement_text, transform=ax.transAxes, fontsize=9, verticalalignment='top', bbox=dict(boxstyle='round', facecolor='lightcyan', alpha=0.9))
             
-            plt.tight_layout()
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
-            plt.close(fig)
+            fig.tight_layout()
+            fig.savefig(output_path, dpi=120, bbox_inches='tight')
             
             logger.info(f"Chart generated successfully: {output_path}")
             return output_path
@@ -182,53 +252,40 @@ Overall Avg: {total_avg:.2f} pkts/sec"""
             "statistics": {}        # 提供額外的統計數據
         }
 
-        for _, row in df.iterrows():
-            node_id = str(row['Node ID'])
-            neighbor_id = str(row['Neighbor ID'])
-            
-            # 判斷樓層類型
-            node_floor = self.get_node_floor(node_id, self.floors_config)
-            neighbor_floor = self.get_node_floor(neighbor_id, self.floors_config)
-            floor_type = "same-floor" if node_floor == neighbor_floor else "cross-floor"
-            
-            chart_json["data_points"].append({
+        # 判斷樓層類型 (vectorized): one map per column replaces the per-row
+        # get_node_floor calls. Unknown nodes share a sentinel so two unknown
+        # floors still compare equal, matching the old None == None behavior.
+        node_floor = df['Node ID'].map(self._node_floor).fillna('')
+        neighbor_floor = df['Neighbor ID'].map(self._node_floor).fillna('')
+        # The comparison is computed once and kept both as the int8 mask the
+        # statistics group on and as the label string the frontend expects.
+        same_floor = (node_floor.values == neighbor_floor.values)
+        df['same_floor'] = same_floor.astype(np.int8)
+        df['floor_type'] = np.where(same_floor, 'same-floor', 'cross-floor')
+
+        chart_json["data_points"] = [
+            {
                 "node_id": node_id,
                 "neighbor_id": neighbor_id,
-                "reception_rate": row['Average Reception Rate'],
-                "test_group": row['Test Group'],
+                "reception_rate": rate,
+                "test_group": test_group,
                 "floor_type": floor_type
-            })
+            }
+            for node_id, neighbor_id, rate, test_group, floor_type
+            in zip(df['Node ID'], df['Neighbor ID'], df['Average Reception Rate'],
+                   df['Test Group'], df['floor_type'])
+        ]
 
+        # One grouped pass computes every per-group statistic at once; the
+        # int8 mask keys the same/cross split without string comparisons.
+        floor_means = df.groupby(['Test Group', 'same_floor'])['Average Reception Rate'].mean()
+        group_means = df.groupby('Test Group')['Average Reception Rate'].mean()
         for test_group in test_groups:
-            group_df = df[df['Test Group'] == test_group]
-            
-            # 計算同樓層和跨樓層的平均值
-            same_floor_sum = 0
-            same_floor_count = 0
-            cross_floor_sum = 0
-            cross_floor_count = 0
-
-            for _, row in group_df.iterrows():
-                node_floor = self.get_node_floor(str(row['Node ID']), self.floors_config)
-                neighbor_floor = self.get_node_floor(str(row['Neighbor ID']), self.floors_config)
-                rate = row['Average Reception Rate']
-                
-                if node_floor == neighbor_floor:
-                    same_floor_sum += rate
-                    same_floor_count += 1
-                else:
-                    cross_floor_sum += rate
-                    cross_floor_count += 1
-
-            
-            same_avg = same_floor_sum / same_floor_count if same_floor_count > 0 else 0
-            cross_avg = cross_floor_sum / cross_floor_count if cross_floor_count > 0 else 0
-            total_avg = group_df['Average Reception Rate'].mean()
-
+            total_avg = group_means.get(test_group)
             chart_json["statistics"][test_group] = {
                 "overall_avg": round(total_avg, 2) if pd.notna(total_avg) else 0,
-                "cross_floor_avg": round(cross_avg, 2),
-                "same_floor_avg": round(same_avg, 2)
+                "cross_floor_avg": round(floor_means.get((test_group, 0), 0), 2),
+                "same_floor_avg": round(floor_means.get((test_group, 1), 0), 2)
             }
         
         if len(test_groups) >= 2:
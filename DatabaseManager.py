@@ -1,23 +1,89 @@
+import csv
+import os
+import queue
 import sqlite3
+import threading
+import numpy as np
 import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
+def decode_captured_samples(value):
+    """Returns captured tx/rx samples as a list of ints.
+
+    Handles both the packed int16 BLOB format and the legacy comma-joined
+    TEXT rows that predate it.
+    """
+    if isinstance(value, bytes):
+        return np.frombuffer(value, dtype=np.int16).tolist()
+    if isinstance(value, str) and value:
+        return np.fromstring(value, dtype=np.int32, sep=',').tolist()
+    # None/NaN and empty strings all mean "no samples".
+    return []
+
 class DatabaseManager:
     def __init__(self, db_path):
         self.db_path = db_path
+        # Persistent writer connection for the MQTT hot path. Opening a fresh
+        # connection and committing a one-row transaction per message paid the
+        # full connection-setup plus fsync cost each time; WAL with
+        # synchronous=NORMAL amortizes that across batched writes.
+        self._write_conn = sqlite3.connect(
+            db_path, timeout=5, check_same_thread=False, isolation_level=None,
+            cached_statements=256
+        )
+        self._write_conn.execute('PRAGMA journal_mode=WAL;')
+        self._write_conn.execute('PRAGMA synchronous=NORMAL;')
+        self._write_conn.execute('PRAGMA busy_timeout=5000;')
+        self._write_conn.execute('PRAGMA temp_store=MEMORY;')
+        self._write_conn.execute('PRAGMA cache_size=-65536;')
+        self._write_conn.execute('PRAGMA wal_autocheckpoint=1000;')
+        self._write_lock = threading.Lock()
+        # app_test_id values repeat for every message in a test run; keep the
+        # mapping in memory so the hot path skips a connection + two SELECTs.
+        self._display_name_cache = {}
+        self._cache_lock = threading.Lock()
+        # Monotonic data version used to debounce CSV regeneration: exports
+        # are skipped while no write has happened since the last one.
+        self._data_version = 0
+        self._csv_version = -1
+        self._csv_path = None
+        # Signals the chart-update thread that data changed; lets it sleep
+        # instead of polling on a fixed interval.
+        self.data_changed = threading.Event()
+        # Lazily-created per-thread reader connections (Flask handlers, the
+        # MQTT thread); see _get_connection.
+        self._local = threading.local()
+        # raw_log entries are fire-and-forget audit records: queue them and
+        # batch-insert from a dedicated thread so the MQTT callback never
+        # waits on a raw_log commit.
+        self._raw_queue = queue.Queue(maxsize=10000)
+        self._raw_writer = threading.Thread(target=self._raw_log_writer, daemon=True)
+        self._raw_writer.start()
 
     def _get_connection(self):
-        conn = sqlite3.connect(self.db_path, timeout=5)
-        conn.execute('PRAGMA journal_mode=WAL;')
+        """Returns this thread's persistent connection, creating it lazily.
+
+        Opening a fresh connection per query was the dominant fixed cost of
+        every API request; with WAL these readers run alongside the writer.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, cached_statements=256)
+            conn.execute('PRAGMA journal_mode=WAL;')
+            conn.execute('PRAGMA synchronous=NORMAL;')
+            conn.execute('PRAGMA temp_store=MEMORY;')
+            conn.execute('PRAGMA cache_size=-65536;')
+            conn.execute('PRAGMA mmap_size=268435456;')
+            self._local.conn = conn
         return conn
 
     def init_database(self):
         """Initializes the database tables."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''CREATE TABLE IF NOT EXISTS raw_log (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS raw_log (id INTEGER PRIMARY KEY AUTOINCREMENT, payload BLOB, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
             cursor.execute('''CREATE TABLE IF NOT EXISTS device_reception_data (id INTEGER PRIMARY KEY AUTOINCREMENT, sender_device_id TEXT, receiver_device_id TEXT, reception_rate REAL, timestamp DATETIME, test_group TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP,  packet_rssi INTEGER)''')
             cursor.execute('''CREATE TABLE IF NOT EXISTS average_reception_rates (id INTEGER PRIMARY KEY AUTOINCREMENT, node_id TEXT, neighbor_id TEXT, average_reception_rate REAL, test_group TEXT, average_rssi REAL, UNIQUE(node_id, neighbor_id, test_group))''')
             cursor.execute('''CREATE TABLE IF NOT EXISTS test_group_mapping (id INTEGER PRIMARY KEY AUTOINCREMENT, app_test_id TEXT UNIQUE, display_name TEXT)''')
@@ -30,8 +96,8 @@ class DatabaseManager:
                     test_method TEXT NOT NULL,
                     timestamp DATETIME NOT NULL,
                     test_group_id TEXT NOT NULL,
-                    captured_txs TEXT, 
-                    captured_rxs TEXT,
+                    captured_txs BLOB, 
+                    captured_rxs BLOB,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     UNIQUE(device_id, test_method, test_group_id) 
                 )
@@ -39,26 +105,65 @@ class DatabaseManager:
 
 
             try:
-                cursor.execute("ALTER TABLE profile_results ADD COLUMN captured_txs TEXT")
+                cursor.execute("ALTER TABLE profile_results ADD COLUMN captured_txs BLOB")
                 logger.info("Column 'captured_txs' added to 'profile_results' table.")
             except sqlite3.OperationalError:
                 pass # Column already exists
             
             try:
-                cursor.execute("ALTER TABLE profile_results ADD COLUMN captured_rxs TEXT")
+                cursor.execute("ALTER TABLE profile_results ADD COLUMN captured_rxs BLOB")
                 logger.info("Column 'captured_rxs' added to 'profile_results' table.")
             except sqlite3.OperationalError:
                 pass # Column already exists
 
+            try:
+                cursor.execute("ALTER TABLE average_reception_rates ADD COLUMN sample_count INTEGER DEFAULT 0")
+                logger.info("Column 'sample_count' added to 'average_reception_rates' table.")
+            except sqlite3.OperationalError:
+                pass # Column already exists
+
+            # Numeric sort keys for the export ORDER BY: sorting on
+            # CAST(node_id AS INTEGER) per query defeats indexing, so the
+            # cast lives in generated columns backed by an index. ALTER TABLE
+            # can only add VIRTUAL generated columns, but the index stores
+            # the computed values anyway.
+            try:
+                cursor.execute("ALTER TABLE average_reception_rates ADD COLUMN node_id_int INTEGER GENERATED ALWAYS AS (CAST(node_id AS INTEGER)) VIRTUAL")
+                cursor.execute("ALTER TABLE average_reception_rates ADD COLUMN neighbor_id_int INTEGER GENERATED ALWAYS AS (CAST(neighbor_id AS INTEGER)) VIRTUAL")
+                logger.info("Numeric sort columns added to 'average_reception_rates' table.")
+            except sqlite3.OperationalError:
+                pass # Columns already exist
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_arr_sort ON average_reception_rates(test_group, node_id_int, neighbor_id_int)''')
+
+            # Indexes for the per-message lookups and group-scoped deletes,
+            # which otherwise scan device_reception_data in full. The trailing
+            # reception_rate makes the triple index covering for the average
+            # rebuild's GROUP BY ... AVG(reception_rate), so that scan never
+            # touches the main table rows.
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_drd_group ON device_reception_data(test_group)''')
+            cursor.execute('''DROP INDEX IF EXISTS idx_drd_triple''')
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_drd_triple_cov ON device_reception_data(sender_device_id, receiver_device_id, test_group, reception_rate)''')
+            # The UNIQUE constraint indexes (device_id, test_method,
+            # test_group_id), which only serves the per-device prefix; the
+            # group-scoped delete filters device_id + test_group_id directly.
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_profile_device_group ON profile_results(device_id, test_group_id)''')
+            # Refresh planner statistics so the new indexes actually get used.
+            cursor.execute('ANALYZE')
+
+            cursor.execute("SELECT app_test_id, display_name FROM test_group_mapping")
+            with self._cache_lock:
+                self._display_name_cache = dict(cursor.fetchall())
+
             conn.commit()
             logger.info("Database initialized successfully.")
 
     def save_profile_result(self, device_id, avg_tx, avg_rx, test_method, timestamp, test_group_id, captured_txs, captured_rxs):
         """Saves a single profile test result, including captured raw data, to the database."""
         
-        # 陣列轉換為逗號分隔的字串以便儲存
-        txs_str = ','.join(map(str, captured_txs))
-        rxs_str = ','.join(map(str, captured_rxs))
+        # 打包成 int16 BLOB 儲存: one memcpy instead of a str per sample,
+        # and roughly a quarter of the comma-joined TEXT size on disk.
+        txs_blob = sqlite3.Binary(np.asarray(captured_txs, dtype=np.int16).tobytes())
+        rxs_blob = sqlite3.Binary(np.asarray(captured_rxs, dtype=np.int16).tobytes())
 
         sql = '''
             INSERT OR REPLACE INTO profile_results 
@@ -68,7 +173,7 @@ class DatabaseManager:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(sql, (device_id, avg_tx, avg_rx, test_method, timestamp, test_group_id, txs_str, rxs_str))
+                cursor.execute(sql, (device_id, avg_tx, avg_rx, test_method, timestamp, test_group_id, txs_blob, rxs_blob))
                 conn.commit()
                 logger.info(f"Profile result saved for device {device_id}, method {test_method}.")
         except Exception as e:
@@ -76,34 +181,85 @@ class DatabaseManager:
 
 
     def save_to_database(self, parsed_data, test_group: str, packet_rssi: int):
-        """Saves parsed data to the database."""
+        """Saves parsed data to the database.
+
+        Accepts either the object form (ParsedBLEData with a DeviceInfo
+        list) or the struct-of-arrays form (ParsedBLEDataSoA), whose flat
+        id/rate arrays zip straight into the insert rows.
+        """
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                for device in parsed_data.devices:
-                    cursor.execute('''INSERT INTO device_reception_data (sender_device_id, receiver_device_id, reception_rate, timestamp, test_group, packet_rssi) VALUES (?, ?, ?, ?, ?, ?)''', 
-                                   (parsed_data.sender_device_id, device.device_id, device.reception_rate, device.timestamp, test_group, packet_rssi))
-                conn.commit()
-                logger.info(f"Data saved successfully for sender {parsed_data.sender_device_id}, test group '{test_group}'.")
-                self._update_average_rates()
+            sender = parsed_data.sender_device_id
+            if hasattr(parsed_data, 'device_ids'):
+                ts = parsed_data.raw_timestamp
+                rows = [(sender, str(device_id), rate, ts, test_group, packet_rssi)
+                        for device_id, rate in zip(parsed_data.device_ids, parsed_data.rates)]
+            else:
+                rows = [(sender, device.device_id, device.reception_rate, device.timestamp, test_group, packet_rssi)
+                        for device in parsed_data.devices]
+            # Incremental running-average upsert: touches only the
+            # (node, neighbor, group) tuples in this message instead of
+            # re-aggregating the whole device_reception_data table per save.
+            avg_rows = [(sender, row[1], test_group, row[2], packet_rssi) for row in rows]
+            with self._write_lock:
+                try:
+                    self._write_conn.execute("BEGIN")
+                    self._write_conn.executemany('''INSERT INTO device_reception_data (sender_device_id, receiver_device_id, reception_rate, timestamp, test_group, packet_rssi) VALUES (?, ?, ?, ?, ?, ?)''', rows)
+                    self._write_conn.executemany('''
+                        INSERT INTO average_reception_rates (node_id, neighbor_id, test_group, average_reception_rate, average_rssi, sample_count)
+                        VALUES (?, ?, ?, ?, ?, 1)
+                        ON CONFLICT(node_id, neighbor_id, test_group) DO UPDATE SET
+                            average_reception_rate = (average_reception_rate * sample_count + excluded.average_reception_rate) / (sample_count + 1),
+                            average_rssi = (average_rssi * sample_count + excluded.average_rssi) / (sample_count + 1),
+                            sample_count = sample_count + 1
+                    ''', avg_rows)
+                    self._write_conn.execute("COMMIT")
+                except Exception:
+                    self._write_conn.execute("ROLLBACK")
+                    raise
+            self._data_version += 1
+            self.data_changed.set()
+            logger.debug("Data saved successfully for sender %s, test group '%s'.", sender, test_group)
         except Exception as e:
             logger.error(f"Error saving data to database: {e}", exc_info=True)
-    
-    def save_raw_log(self, payload: str):
-        """Saves the raw MQTT payload to the log."""
+
+    def save_raw_log(self, payload):
+        """Queues the raw MQTT payload for the background log writer."""
         try:
-            with self._get_connection() as conn:
-                conn.cursor().execute("INSERT INTO raw_log (payload) VALUES (?)", (payload,))
+            self._raw_queue.put_nowait(payload)
+        except queue.Full:
+            logger.warning("raw_log queue full; dropping payload")
+
+    def flush_raw_logs(self):
+        """Blocks until every queued raw_log payload has been written."""
+        self._raw_queue.join()
+
+    def _raw_log_writer(self):
+        """Drains the raw_log queue in batches of up to 200 rows."""
+        conn = sqlite3.connect(self.db_path, timeout=5, cached_statements=256)
+        conn.execute('PRAGMA journal_mode=WAL;')
+        conn.execute('PRAGMA synchronous=NORMAL;')
+        while True:
+            batch = [self._raw_queue.get()]
+            try:
+                while len(batch) < 200:
+                    batch.append(self._raw_queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                conn.executemany("INSERT INTO raw_log (payload) VALUES (?)", [(p,) for p in batch])
                 conn.commit()
-        except Exception as e:
-            logger.error(f"Error saving raw log: {e}", exc_info=True)
+            except Exception as e:
+                logger.error(f"Error saving raw log batch: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._raw_queue.task_done()
 
     def get_all_profile_results(self):
         """Retrieves all data from the profile_results table."""
         try:
             with self._get_connection() as conn:
-                conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
                 cursor.execute("SELECT * FROM profile_results ORDER BY device_id, test_group_id, test_method")
                 rows = cursor.fetchall()
                 return [dict(row) for row in rows]
@@ -151,12 +307,21 @@ class DatabaseManager:
             logger.error(f"Error getting test groups: {e}", exc_info=True)
             return []
         
+    def _fetch_all_as_dicts(self, sql):
+        """Runs a query and returns its rows as plain dicts.
+
+        Building dicts straight off the cursor skips the DataFrame that
+        pd.read_sql_query materialized just to call to_dict on it.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.execute(sql)
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
     def get_all_data(self):
         """Retrieves all data from the device reception data table."""
         try:
-            with self._get_connection() as conn:
-                df = pd.read_sql_query("SELECT * FROM device_reception_data", conn)
-                return df.to_dict(orient='records')
+            return self._fetch_all_as_dicts("SELECT * FROM device_reception_data")
         except Exception as e:
             logger.error(f"Error retrieving all data: {e}", exc_info=True)
             return []
@@ -164,9 +329,7 @@ class DatabaseManager:
     def get_all_average_rates_data(self):
         """Retrieves all average reception rates data."""
         try:
-            with self._get_connection() as conn:
-                df = pd.read_sql_query("SELECT * FROM average_reception_rates", conn)
-                return df.to_dict(orient='records')
+            return self._fetch_all_as_dicts("SELECT * FROM average_reception_rates")
         except Exception as e:
             logger.error(f"Error retrieving average rates data: {e}", exc_info=True)
             return []
@@ -174,20 +337,29 @@ class DatabaseManager:
     def get_all_raw_logs(self):
         """Retrieves all raw logs."""
         try:
-            with self._get_connection() as conn:
-                df = pd.read_sql_query("SELECT * FROM raw_log", conn)
-                return df.to_dict(orient='records')
+            rows = self._fetch_all_as_dicts("SELECT * FROM raw_log")
+            # Payloads are stored as BLOBs; decode for JSON consumers.
+            for row in rows:
+                payload = row['payload']
+                if isinstance(payload, bytes):
+                    row['payload'] = payload.decode('utf-8', 'replace')
+            return rows
         except Exception as e:
             logger.error(f"Error retrieving raw logs: {e}", exc_info=True)
             return []
         
     def get_or_create_display_name(self, app_test_id: str) -> str:
         """Gets or creates a human-readable display name for a given test ID."""
+        cached = self._display_name_cache.get(app_test_id)
+        if cached is not None:
+            return cached
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT display_name FROM test_group_mapping WHERE app_test_id = ?", (app_test_id,))
             result = cursor.fetchone()
             if result:
+                with self._cache_lock:
+                    self._display_name_cache[app_test_id] = result[0]
                 return result[0]
             else:
                 cursor.execute("SELECT count(id) FROM test_group_mapping")
@@ -196,19 +368,32 @@ class DatabaseManager:
                 cursor.execute("INSERT INTO test_group_mapping (app_test_id, display_name) VALUES (?, ?)", (app_test_id, new_display_name))
                 conn.commit()
                 logger.info(f"New test ID '{app_test_id}' detected. Assigned name: '{new_display_name}'")
+                with self._cache_lock:
+                    self._display_name_cache[app_test_id] = new_display_name
                 return new_display_name
 
     def _update_average_rates(self):
-        """Updates the average reception rates table."""
+        """Rebuilds the average reception rates table from scratch.
+
+        The save path keeps the averages current incrementally; this full
+        recomputation is kept as a repair utility.
+        """
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''SELECT sender_device_id, receiver_device_id, ROUND(AVG(reception_rate),2), test_group, ROUND(AVG(rssi),0) FROM device_reception_data GROUP BY sender_device_id, receiver_device_id, test_group''')
-                results = cursor.fetchall()
-                for row in results:
-                    cursor.execute('''INSERT OR REPLACE INTO average_reception_rates (node_id, neighbor_id, average_reception_rate, test_group, average_rssi) VALUES (?, ?, ?, ?, ?)''', row)
+                # One INSERT ... SELECT keeps the aggregation and the upsert
+                # inside SQLite's VM instead of round-tripping every grouped
+                # row through Python.
+                cursor.execute('''
+                    INSERT OR REPLACE INTO average_reception_rates (node_id, neighbor_id, average_reception_rate, test_group, average_rssi, sample_count)
+                    SELECT sender_device_id, receiver_device_id, ROUND(AVG(reception_rate),2), test_group, ROUND(AVG(packet_rssi),0), COUNT(*)
+                    FROM device_reception_data
+                    GROUP BY sender_device_id, receiver_device_id, test_group
+                ''')
                 conn.commit()
-                logger.info(f"Average reception rates updated for {len(results)} combinations.")
+                self._data_version += 1
+                self.data_changed.set()
+                logger.info(f"Average reception rates updated for {cursor.rowcount} combinations.")
         except Exception as e:
             logger.error(f"Error updating average rates: {e}", exc_info=True)
 
@@ -219,12 +404,19 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 logger.warning("!!! Clearing all database tables !!!")
                 tables = ['device_reception_data', 'average_reception_rates', 'raw_log', 'test_group_mapping']
-                for table in tables:
-                    cursor.execute(f"DELETE FROM {table}")
-                    logger.info(f"Cleared table: {table}")
-                cursor.execute(f"DELETE FROM sqlite_sequence WHERE name IN ({','.join('?'*len(tables))})", tables)
-                logger.info("Reset ID counters.")
-                conn.commit()
+                # One BEGIN IMMEDIATE..COMMIT script: the write lock is taken
+                # once and all deletes share a single journal flush.
+                names = ','.join(f"'{t}'" for t in tables)
+                cursor.executescript(
+                    "BEGIN IMMEDIATE;"
+                    + ''.join(f"DELETE FROM {t};" for t in tables)
+                    + f"DELETE FROM sqlite_sequence WHERE name IN ({names});"
+                    + "COMMIT;")
+                logger.info("Cleared tables and reset ID counters: %s", ', '.join(tables))
+                with self._cache_lock:
+                    self._display_name_cache.clear()
+                self._data_version += 1
+                self.data_changed.set()
                 logger.warning("Database cleared successfully!")
                 return True
         except Exception as e:
@@ -237,16 +429,18 @@ class DatabaseManager:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 logger.warning(f"!!! Attempting to delete all data for test group: '{display_name}' !!!")
+                # Single write transaction for all three deletes.
+                cursor.execute("BEGIN IMMEDIATE")
                 cursor.execute("DELETE FROM device_reception_data WHERE test_group = ?", (display_name,))
-                logger.info(f"Deleted from device_reception_data for group '{display_name}'.")
                 cursor.execute("DELETE FROM average_reception_rates WHERE test_group = ?", (display_name,))
-                logger.info(f"Deleted from average_reception_rates for group '{display_name}'.")
                 cursor.execute("DELETE FROM test_group_mapping WHERE display_name = ?", (display_name,))
-                logger.info(f"Deleted from test_group_mapping for group '{display_name}'.")
+                cursor.execute("COMMIT")
+                with self._cache_lock:
+                    self._display_name_cache = {k: v for k, v in self._display_name_cache.items() if v != display_name}
+                self._data_version += 1
+                self.data_changed.set()
 
                 # can't delete from raw_log as it's a permanent audit log without a direct test_group link.
-
-                conn.commit()
                 logger.warning(f"Successfully deleted all data for test group: '{display_name}'.")
                 return True
         except Exception as e:
@@ -261,10 +455,10 @@ class DatabaseManager:
                     SELECT 
                         node_id as "Node ID", 
                         neighbor_id as "Neighbor ID", 
-                        average_reception_rate as "Average Reception Rate", 
+                        ROUND(average_reception_rate, 2) as "Average Reception Rate", 
                         test_group as "Test Group" 
                     FROM average_reception_rates 
-                    ORDER BY "Test Group", CAST("Node ID" AS INTEGER), CAST("Neighbor ID" AS INTEGER)
+                    ORDER BY test_group, node_id_int, neighbor_id_int
                 ''', conn)
                 return df
         except Exception as e:
@@ -274,9 +468,19 @@ class DatabaseManager:
     def export_to_csv(self, output_path="data_all.csv"):
         """Exports average reception rates to a CSV file."""
         try:
+            if (self._csv_version == self._data_version and self._csv_path == output_path
+                    and os.path.exists(output_path)):
+                return output_path
+            # Stream rows straight from the cursor to the file; materializing
+            # a DataFrame first doubled peak memory just to write CSV.
             with sqlite3.connect(self.db_path) as conn:
-                df = pd.read_sql_query('''SELECT node_id as 'Node ID', neighbor_id as 'Neighbor ID', average_reception_rate as 'Average Reception Rate', test_group as 'Test Group' FROM average_reception_rates ORDER BY test_group, CAST(node_id AS INTEGER), CAST(neighbor_id AS INTEGER)''', conn)
-                df.to_csv(output_path, index=False, encoding='utf-8-sig')
+                cursor = conn.execute('''SELECT node_id, neighbor_id, ROUND(average_reception_rate, 2), test_group FROM average_reception_rates ORDER BY test_group, node_id_int, neighbor_id_int''')
+                with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['Node ID', 'Neighbor ID', 'Average Reception Rate', 'Test Group'])
+                    writer.writerows(cursor)
+                self._csv_version = self._data_version
+                self._csv_path = output_path
                 logger.info(f"CSV exported successfully: {output_path}")
                 return output_path
         except Exception as e:
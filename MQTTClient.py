@@ -15,14 +15,22 @@ class MQTTClient:
         self.topics = topics if topics is not None else []
         self.on_message_callback = on_message_callback
         
-        self.client = mqtt.Client(client_id=f"backend-processor-{os.getpid()}")
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2,
+                                  client_id=f"backend-processor-{os.getpid()}",
+                                  protocol=mqtt.MQTTv5)
         self.client.username_pw_set(self.mqtt_username, self.mqtt_password)
+        # Back off between reconnect attempts instead of hammering the broker
+        # from the network loop, and allow a deeper in-flight window so the
+        # broker can keep streaming while messages queue for processing.
+        self.client.reconnect_delay_set(min_delay=1, max_delay=30)
+        self.client.max_inflight_messages_set(100)
+        self.client.max_queued_messages_set(0)
         self.client.on_connect = self._on_mqtt_connect
         self.client.on_message = self._on_mqtt_message
 
-    def _on_mqtt_connect(self, client, userdata, flags, rc):
-        """MQTT on_connect callback."""
-        if rc == 0:
+    def _on_mqtt_connect(self, client, userdata, flags, reason_code, properties=None):
+        """MQTT on_connect callback (callback API v2)."""
+        if reason_code == 0:
             logger.info("MQTT connection successful.")
 
             if not self.topics:
@@ -33,15 +41,15 @@ class MQTTClient:
                 client.subscribe(topic)
                 logger.info(f"Subscribed to topic: {topic}")
         else:
-            logger.error(f"MQTT connection failed with code: {rc}")
+            logger.error(f"MQTT connection failed with code: {reason_code}")
     
     def _on_mqtt_message(self, client, userdata, msg):
         """MQTT on_message callback."""
         try:
-            payload = msg.payload.decode('utf-8')
-
+            # Hand the raw bytes through; the processor stores them verbatim
+            # and decodes only when a handler actually needs the text.
             if self.on_message_callback:
-                self.on_message_callback(msg.topic, payload)
+                self.on_message_callback(msg.topic, msg.payload)
                 
         except Exception as e:
             logger.error(f"Error processing MQTT message: {e}", exc_info=True)
@@ -1,7 +1,10 @@
 from flask import Blueprint, jsonify, send_file, request
+import numpy as np
 import os
 import logging
 
+from DatabaseManager import decode_captured_samples
+
 api_blueprint = Blueprint('api', __name__, url_prefix='/api')
 
 logging.basicConfig(level=logging.INFO)
@@ -30,8 +33,9 @@ def create_api_blueprint(db_manager, processor, chart_generator, analyzer):
                 txs_str = row.get('captured_txs', '')
                 rxs_str = row.get('captured_rxs', '')
                 
-                captured_txs = [int(val) for val in txs_str.split(',') if val] if txs_str else []
-                captured_rxs = [int(val) for val in rxs_str.split(',') if val] if rxs_str else []
+                # Decodes the packed int16 BLOB (or legacy TEXT) in C.
+                captured_txs = decode_captured_samples(txs_str)
+                captured_rxs = decode_captured_samples(rxs_str)
                 
                 test_group_dict[test_method] = {
                     'avg_tx': row['avg_tx'],
@@ -103,14 +107,16 @@ def create_api_blueprint(db_manager, processor, chart_generator, analyzer):
         if not os.path.exists(chart_path):
             return jsonify({'error': 'Chart file not yet generated.'}), 404
             
-        return send_file(chart_path, mimetype='image/png')
+        # conditional=True serves ETag/Last-Modified and answers revalidation
+        # requests with 304, so repeated polls don't re-send the PNG.
+        return send_file(chart_path, mimetype='image/png', conditional=True)
 
     @api_blueprint.route('/data')
     def get_data():
         csv_path = db_manager.export_to_csv()
         if not csv_path:
             return jsonify({'error': 'Failed to export CSV.'}), 500
-        return send_file(csv_path, mimetype='text/csv')
+        return send_file(csv_path, mimetype='text/csv', conditional=True)
     
     @api_blueprint.route('/get_all_data', methods=['GET'])
     def get_all_data():
@@ -131,7 +137,7 @@ def create_api_blueprint(db_manager, processor, chart_generator, analyzer):
     @api_blueprint.route('/get_all_raw_log', methods=['GET'])
     def get_all_raw_log():
         # Retrieve data from the database
-        data = db_manager.get_all_raw_log()
+        data = db_manager.get_all_raw_logs()
         if not data:
             return jsonify({'error': 'No raw log data found.'}), 404
         return jsonify(data)
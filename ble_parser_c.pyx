@@ -0,0 +1,38 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Optional C accelerator for the BLE payload field extraction.
+
+Build in place with:
+
+    python setup_ble_ext.py build_ext --inplace
+
+BLEParser falls back to its generated pure-Python cores when this module
+is not compiled, so the extension is never required.
+"""
+
+
+cpdef tuple parse_fields(const unsigned char[::1] buf, int offset, bint skip_empty_slots):
+    """Extracts (temperature, pressure, seconds, ids, counts, rates, reached).
+
+    ids/counts/rates only contain the kept device slots (empty slots are
+    dropped when skip_empty_slots is set, mirroring the 15-byte format).
+    """
+    cdef int temperature = buf[offset]
+    cdef double pressure = ((buf[offset + 1] << 16) | (buf[offset + 2] << 8) | buf[offset + 3]) / 100.0
+    cdef int seconds = buf[offset + 4]
+    cdef double inv_sec = (1.0 / seconds) if seconds > 0 else 0.0
+    cdef int i, d, c
+    cdef bint reached = False
+    ids = []
+    counts = []
+    rates = []
+    for i in range(5):
+        d = buf[offset + 5 + 2 * i]
+        c = buf[offset + 6 + 2 * i]
+        if skip_empty_slots and d == 0:
+            continue
+        ids.append(d)
+        counts.append(c)
+        rates.append(c * inv_sec)
+        if c >= 100:
+            reached = True
+    return (temperature, pressure, seconds, ids, counts, rates, reached)
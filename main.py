@@ -1,4 +1,5 @@
 import json
+import concurrent.futures
 import matplotlib
 matplotlib.use('Agg')
 from datetime import datetime
@@ -6,6 +7,7 @@ import threading
 import time
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List
 import logging
 from flask import Flask
@@ -40,6 +42,18 @@ class ParsedBLEData:
     has_reached_target: bool
     raw_timestamp: datetime
 
+@lru_cache(maxsize=1024)
+def _parse_log_timestamp(timestamp_str: str) -> datetime:
+    """Parses the fixed 'YYYY-MM-DD HH:MM:SS' log timestamp format.
+
+    strptime re-runs its format machinery on every call, and the same
+    second-resolution string repeats across the components of one payload;
+    plain slicing plus an LRU cache keeps this off the hot path. Raises
+    ValueError on malformed input, like strptime.
+    """
+    return datetime(int(timestamp_str[0:4]), int(timestamp_str[5:7]), int(timestamp_str[8:10]),
+                    int(timestamp_str[11:13]), int(timestamp_str[14:16]), int(timestamp_str[17:19]))
+
 class MQTTBLEDataProcessor:
     def __init__(self, db_manager: DatabaseManager, mqtt_client: MQTTClient, chart_generator: ChartGenerator):
         
@@ -51,25 +65,39 @@ class MQTTBLEDataProcessor:
 
         ble_parser = BLEParser()
         self.ble_parser = ble_parser
-    
-    def _on_message_callback(self, topic, payload): 
+
+        # A single ingest worker keeps message ordering while freeing the
+        # MQTT network thread to keep draining the socket; parsing and
+        # database writes no longer run in Paho's callback.
+        self._ingest_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='ingest'
+        )
+
+    def _on_message_callback(self, topic, payload):
+        self._ingest_pool.submit(self._handle_message, topic, payload)
+
+    def _handle_message(self, topic, payload):
         try:
+            # Raw bytes go into the audit log as-is; decoding happens once
+            # here, after the BLOB write, instead of inside the MQTT loop.
             self.db_manager.save_raw_log(payload)
+            if isinstance(payload, bytes):
+                payload = payload.decode('utf-8')
             if topic == "log/scanner/upload":
-                logger.info(f"Processing Neighbor mode log: {payload[:100]}...")
+                logger.debug("Processing Neighbor mode log: %.100s...", payload)
                 self._process_ble_log_message(payload)
             elif topic == "profile/result/upload":
-                logger.info(f"Processing Profile result: {payload}")
+                logger.debug("Processing Profile result: %s", payload)
                 self._process_profile_result_message(payload)
             elif topic == "profile/result/delete":
-                logger.info(f"Processing Profile delete request: {payload}")
+                logger.debug("Processing Profile delete request: %s", payload)
                 self._process_profile_delete_message(payload)
             else:
-                logger.warning(f"Received message on unhandled topic: {topic}")
+                logger.warning("Received message on unhandled topic: %s", topic)
                 
                 
         except Exception as e:
-            logger.error(f"Error processing MQTT message payload: {e}", exc_info=True)
+            logger.error("Error processing MQTT message payload: %s", e, exc_info=True)
 
 
     def start(self):
@@ -77,6 +105,7 @@ class MQTTBLEDataProcessor:
 
     def stop(self):
         self.mqtt_client.stop()
+        self._ingest_pool.shutdown(wait=True)
     def _process_profile_delete_message(self, payload: str):
         """Processes the Profile delete message payload."""
         try:
@@ -88,7 +117,7 @@ class MQTTBLEDataProcessor:
             self.db_manager.delete_all_profile_results_for_device(device_id)
 
         except Exception as e:
-            logger.error(f"An unexpected error occurred in _process_profile_delete_message: {e}", exc_info=True)
+            logger.error("An unexpected error occurred in _process_profile_delete_message: %s", e, exc_info=True)
 
     def _process_profile_result_message(self, payload: str):
         """Processes the new Profile result message payload including raw data arrays."""
@@ -96,7 +125,7 @@ class MQTTBLEDataProcessor:
             # deviceID,avg_tx,avg_rx,testMethod,timestamp,testgroup,tx_array,rx_array
             parts = payload.split(',')
             if len(parts) != 8:
-                logger.warning(f"Invalid Profile result format. Expected 8 parts, got {len(parts)}: {payload}")
+                logger.warning("Invalid Profile result format. Expected 8 parts, got %d: %s", len(parts), payload)
                 return
 
             device_id = parts[0].strip()
@@ -127,60 +156,71 @@ class MQTTBLEDataProcessor:
             )
 
         except (ValueError, IndexError) as e:
-            logger.error(f"Error parsing profile result payload '{payload}': {e}", exc_info=True)
+            logger.error("Error parsing profile result payload '%s': %s", payload, e, exc_info=True)
         except Exception as e:
-            logger.error(f"An unexpected error occurred in _process_profile_result_message: {e}", exc_info=True)
+            logger.error("An unexpected error occurred in _process_profile_result_message: %s", e, exc_info=True)
 
     def _process_ble_log_message(self, payload):
         """Processes the BLE log message payload."""
         try:
             components = payload.split(',')
             if len(components) % 4 != 0:
-                logger.warning(f"Invalid BLE log format (number of components is not a multiple of 4): {payload}")
+                logger.warning("Invalid BLE log format (number of components is not a multiple of 4): %s", payload)
                 return
 
-            for i in range(0, len(components), 4):
-                if i + 3 < len(components):
-                    raw_data_hex = components[i].strip()
-                    rssi = components[i+1].strip()
-                    timestamp_str = components[i+2].strip()
-                    app_test_id = components[i+3].strip()
-
-                    # display_test_group = self.db_manager.get_or_create_display_name(app_test_id)
-
-                    try:
-                        timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-                    except ValueError as e:
-                        logger.error(f"Timestamp parsing failed: {timestamp_str} - {e}")
-                        continue
-                    
-                    parsed_data = self.ble_parser.parse_ble_raw_data(raw_data_hex, timestamp)
-                    if parsed_data:
-                        self.db_manager.save_to_database(parsed_data, app_test_id, int(rssi))
-                    else:
-                        logger.warning(f"Failed to parse raw data: {raw_data_hex}")
+            # zip over one shared iterator walks the list in groups of four
+            # without the per-iteration index arithmetic and bound checks.
+            it = iter(components)
+            for raw_data_hex, rssi, timestamp_str, app_test_id in zip(it, it, it, it):
+                raw_data_hex = raw_data_hex.strip()
+                rssi = rssi.strip()
+                timestamp_str = timestamp_str.strip()
+                app_test_id = app_test_id.strip()
+
+                # display_test_group = self.db_manager.get_or_create_display_name(app_test_id)
+
+                try:
+                    timestamp = _parse_log_timestamp(timestamp_str)
+                except ValueError as e:
+                    logger.error("Timestamp parsing failed: %s - %s", timestamp_str, e)
+                    continue
+
+                parsed_data = self.ble_parser.parse_ble_raw_data(raw_data_hex, timestamp, as_soa=True)
+                if parsed_data:
+                    self.db_manager.save_to_database(parsed_data, app_test_id, int(rssi))
+                else:
+                    logger.warning("Failed to parse raw data: %s", raw_data_hex)
                         
         except Exception as e:
-            logger.error(f"Error in _process_ble_log_message: {e}", exc_info=True)
+            logger.error("Error in _process_ble_log_message: %s", e, exc_info=True)
 
-# def scheduled_chart_update(db_manager: DatabaseManager, chart_generator: ChartGenerator, interval_seconds=60):
+def scheduled_chart_update(db_manager: DatabaseManager, chart_generator: ChartGenerator, interval_seconds=60, min_interval_seconds=10):
+    """Regenerates the CSV and chart when new data has arrived.
 
-#     logger.info(f"every {interval_seconds} seconds, chart will be updated.")
-#     while True:
-#         try:
-#             time.sleep(interval_seconds)
-            
-#             logger.info("exporting to csv...")
-            
-#             csv_path = db_manager.export_to_csv()
-            
-#             if csv_path:
-#                 chart_generator.generate_chart(csv_path)
-#             else:
-#                 logger.warning("csv data not available to generate chart.")
-                
-#         except Exception as e:
-#             logger.error(f"Error in scheduled_chart_update: {e}", exc_info=True)
+    Waits on the DatabaseManager's change event instead of polling on a
+    fixed interval, so the chart stays untouched while the system is idle
+    and regenerates at most once per min_interval_seconds under load.
+    """
+    logger.info("Chart update thread started (event-driven, checks at most every %d seconds).", interval_seconds)
+    while True:
+        try:
+            db_manager.data_changed.wait(timeout=interval_seconds)
+            if not db_manager.data_changed.is_set():
+                continue
+            db_manager.data_changed.clear()
+
+            logger.info("exporting to csv...")
+            csv_path = db_manager.export_to_csv()
+
+            if csv_path:
+                chart_generator.generate_chart(csv_path)
+            else:
+                logger.warning("csv data not available to generate chart.")
+
+            time.sleep(min_interval_seconds)
+
+        except Exception as e:
+            logger.error("Error in scheduled_chart_update: %s", e, exc_info=True)
 
 if __name__ == "__main__":
     try:
@@ -236,19 +276,21 @@ if __name__ == "__main__":
 
     web_server_port = config['web_server']['port']
     web_thread = threading.Thread(
-        target=lambda: app.run(host='0.0.0.0', port=web_server_port, debug=False),
+        # threaded=True: Werkzeug is single-threaded by default, so one slow
+        # /api/data export would block every other request.
+        target=lambda: app.run(host='0.0.0.0', port=web_server_port, debug=False, threaded=True),
         daemon=True
     )
     web_thread.start()
     logger.info(f"Web API server started at http://0.0.0.0:{web_server_port}")
 
-    # chart_update_interval = config.get('chart_generator', {}).get('update_interval_seconds', 60)
-    
-    # chart_thread = threading.Thread(
-    #     target=scheduled_chart_update,
-    #     args=(db_manager, chart_generator, chart_update_interval), 
-    #     daemon=True  
-    # )
-    # chart_thread.start()
-    
+    chart_update_interval = config.get('chart_generator', {}).get('update_interval_seconds', 60)
+
+    chart_thread = threading.Thread(
+        target=scheduled_chart_update,
+        args=(db_manager, chart_generator, chart_update_interval),
+        daemon=True
+    )
+    chart_thread.start()
+
     processor.start()
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""Builds the optional ble_parser_c extension.
+
+Usage: python setup_ble_ext.py build_ext --inplace
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='ble_parser_c',
+    ext_modules=cythonize('ble_parser_c.pyx'),
+)